@@ -26,7 +26,8 @@ class ProgressCallback(Callback):
         progress_kwargs = progress_kwargs or {}
         tracker = self.model.tracker
         self.bar_column = BarColumn()
-        self.table_column = RenderableColumn(tracker.create_table())
+        # tracker is rendered as a table on each refresh of the progress display
+        self.table_column = RenderableColumn(tracker)
 
         self.progress = Progress(
             "[progress.description]{task.description}",
@@ -59,11 +60,9 @@ class ProgressCallback(Callback):
 
     def on_train_epoch_end(self, *args, **kwargs):
         self.progress.remove_task(self.train_prog_bar)
-        self.table_column.renderable = self.model.tracker.create_table()
 
     def on_train_step_end(self, *args, **kwargs):
         self.progress.update(self.train_prog_bar, advance=1)
-        self.table_column.renderable = self.model.tracker.create_table()
 
     def on_val_epoch_start(self):
         val_len = self.model.autodataset.dataloader_length["val"]
@@ -75,12 +74,10 @@ class ProgressCallback(Callback):
         val_dl = self.model.autodataset.val_dataloader
         if not val_dl:
             return
-        self.table_column.renderable = self.model.tracker.create_table()
         self.progress.remove_task(self.val_prog_bar)
 
     def on_val_step_end(self, *args, **kwargs):
         self.progress.update(self.val_prog_bar, advance=1)
-        self.table_column.renderable = self.model.tracker.create_table()
 
     def clean(self):
         self.progress.stop()
@@ -13,7 +13,7 @@
 #  limitations under the License.
 import typing
 from collections import OrderedDict
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 from gradsflow.callbacks.base import Callback
 from gradsflow.callbacks.progress import ProgressCallback
@@ -33,13 +33,36 @@ class CallbackRunner(Callback):
         "tune_report": TorchTuneReport,
         "progress": ProgressCallback,
     }
+    _EVENT_NAMES = (
+        "on_fit_start",
+        "on_fit_end",
+        "on_epoch_start",
+        "on_epoch_end",
+        "on_train_epoch_start",
+        "on_train_epoch_end",
+        "on_val_epoch_start",
+        "on_val_epoch_end",
+        "on_train_step_start",
+        "on_train_step_end",
+        "on_val_step_start",
+        "on_val_step_end",
+        "on_forward_start",
+        "on_forward_end",
+    )
 
     def __init__(self, model: "Model", *callbacks: Union[str, Callback]):
         super().__init__(model)
-        self.callbacks = []
         self.callbacks = OrderedDict()
+        self._event_handlers: Dict[str, Tuple[Callable, ...]] = {}
         for callback in callbacks:
             self.append(callback)
+        self._cache_event_handlers()
+
+    def _cache_event_handlers(self):
+        """Resolve the bound event methods of each callback once, so that dispatching an event on the training hot
+        path only iterates over a tuple of functions. Must be called whenever `callbacks` changes."""
+        callbacks = tuple(self.callbacks.values())
+        self._event_handlers = {event: tuple(getattr(cb, event) for cb in callbacks) for event in self._EVENT_NAMES}
 
     # skipcq: W0212
     def append(self, callback: Union[str, Callback]):
@@ -52,69 +75,70 @@ class CallbackRunner(Callback):
                 self.callbacks[callback._name] = callback
         except KeyError:
             raise NotImplementedError(f"callback is not implemented {callback}")
+        self._cache_event_handlers()
 
     def available_callbacks(self):
         return list(self._AVAILABLE_CALLBACKS.keys())
 
     def on_train_epoch_end(self, *args, **kwargs):
-        for _, callback in self.callbacks.items():
-            callback.on_train_epoch_end(*args, **kwargs)
+        for fn in self._event_handlers["on_train_epoch_end"]:
+            fn(*args, **kwargs)
 
     def on_train_epoch_start(self):
-        for _, callback in self.callbacks.items():
-            callback.on_train_epoch_start()
+        for fn in self._event_handlers["on_train_epoch_start"]:
+            fn()
 
     def on_fit_start(self):
-        for _, callback in self.callbacks.items():
-            callback.on_fit_start()
+        for fn in self._event_handlers["on_fit_start"]:
+            fn()
 
     def on_fit_end(
         self,
     ):
-        for _, callback in self.callbacks.items():
-            callback.on_fit_end()
+        for fn in self._event_handlers["on_fit_end"]:
+            fn()
 
     def on_val_epoch_start(
         self,
     ):
-        for _, callback in self.callbacks.items():
-            callback.on_val_epoch_start()
+        for fn in self._event_handlers["on_val_epoch_start"]:
+            fn()
 
     def on_val_epoch_end(self, *args, **kwargs):
-        for _, callback in self.callbacks.items():
-            callback.on_val_epoch_end(*args, **kwargs)
+        for fn in self._event_handlers["on_val_epoch_end"]:
+            fn(*args, **kwargs)
 
     def on_train_step_start(self):
-        for _, callback in self.callbacks.items():
-            callback.on_train_step_start()
+        for fn in self._event_handlers["on_train_step_start"]:
+            fn()
 
     def on_train_step_end(self, *args, **kwargs):
-        for _, callback in self.callbacks.items():
-            callback.on_train_step_end(*args, **kwargs)
+        for fn in self._event_handlers["on_train_step_end"]:
+            fn(*args, **kwargs)
 
     def on_val_step_start(self):
-        for _, callback in self.callbacks.items():
-            callback.on_val_step_start()
+        for fn in self._event_handlers["on_val_step_start"]:
+            fn()
 
     def on_val_step_end(self, *args, **kwargs):
-        for _, callback in self.callbacks.items():
-            callback.on_val_step_end(*args, **kwargs)
+        for fn in self._event_handlers["on_val_step_end"]:
+            fn(*args, **kwargs)
 
     def on_epoch_start(self):
-        for _, callback in self.callbacks.items():
-            callback.on_epoch_start()
+        for fn in self._event_handlers["on_epoch_start"]:
+            fn()
 
     def on_epoch_end(self):
-        for _, callback in self.callbacks.items():
-            callback.on_epoch_end()
+        for fn in self._event_handlers["on_epoch_end"]:
+            fn()
 
     def on_forward_start(self):
-        for _, callback in self.callbacks.items():
-            callback.on_forward_start()
+        for fn in self._event_handlers["on_forward_start"]:
+            fn()
 
     def on_forward_end(self):
-        for _, callback in self.callbacks.items():
-            callback.on_forward_end()
+        for fn in self._event_handlers["on_forward_end"]:
+            fn()
 
     def clean(self, keep: Optional[Union[List[str], str]] = None):
         """Remove all the callbacks except callback names provided in keep"""
@@ -123,4 +147,5 @@ class CallbackRunner(Callback):
         not_keep = set(self.callbacks.keys()) - set(listify(keep))
         for key in not_keep:
             self.callbacks.pop(key)
+        self._cache_event_handlers()
         # self.callbacks = OrderedDict(list(self.callbacks.items())[0:1])
@@ -11,25 +11,41 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
+import inspect
 import os
 from pathlib import Path
 from typing import Optional
 
+import torch
+
 from gradsflow.callbacks.base import Callback
 
+# `zero_grad(set_to_none=...)` is available from torch 1.7
+_ZERO_GRAD_SET_TO_NONE = "set_to_none" in inspect.signature(torch.optim.Optimizer.zero_grad).parameters
+
 
 class TrainEvalCallback(Callback):
     _name = "TrainEvalCallback"
 
     def on_train_step_start(self):
-        self.model.optimizer.zero_grad()
+        accumulation_steps = self.model.gradient_accumulation_steps
+        if self.model.tracker.train.steps % accumulation_steps == 0:
+            if _ZERO_GRAD_SET_TO_NONE:
+                self.model.optimizer.zero_grad(set_to_none=self.model.zero_grad_set_to_none)
+            else:
+                self.model.optimizer.zero_grad()
 
     def on_train_step_end(self, *args, outputs: dict = None, **kwargs):
         MODE = "train"
         # ----- AUTO OPTIMIZATION -----
         if not self.model.disable_auto_optimization:
-            self.model.backward(outputs["loss"])
-            self.model.optimizer.step()
+            accumulation_steps = self.model.gradient_accumulation_steps
+            loss = outputs["loss"]
+            if accumulation_steps > 1:
+                loss = loss / accumulation_steps
+            self.model.backward(self.model.scale_loss(loss))
+            if self.model.sync_gradients:
+                self.model.optimizer_step()
 
         # ----- METRIC UPDATES -----
         tracker = self.model.tracker
@@ -45,16 +61,33 @@ class TrainEvalCallback(Callback):
         tracker.track_loss(loss, mode=MODE)
         tracker.track_metrics(outputs.get("metrics", {}), mode=MODE)
 
+    def _track_epoch_metrics(self, mode: str):
+        """Compute the metrics accumulated during epoch and track them."""
+        metrics = self.model.metrics
+        if metrics.updated:
+            self.model.tracker.track_metrics(metrics.compute(), mode=mode)
+        metrics.reset()
+
     def on_train_epoch_start(self):
         self.model.train()
         self.model.metrics.reset()
         self.model.tracker.train.reset()
 
+    def on_train_epoch_end(self, *args, **kwargs):
+        if not self.model.disable_auto_optimization and not self.model.sync_gradients:
+            # dataloader without length ended inside an accumulation window, apply the synchronized gradients
+            self.model.optimizer_step()
+            self.model.sync_gradients = True
+        self._track_epoch_metrics(mode="train")
+
     def on_val_epoch_start(self):
         self.model.eval()
         self.model.metrics.reset()
         self.model.tracker.val.reset()
 
+    def on_val_epoch_end(self, *args, **kwargs):
+        self._track_epoch_metrics(mode="val")
+
 
 class ModelCheckpoint(Callback):
     """
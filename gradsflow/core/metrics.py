@@ -11,7 +11,8 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
-from typing import Dict, Union
+from types import MappingProxyType
+from typing import Dict, Mapping, Union
 
 import torch
 import torchmetrics
@@ -21,19 +22,26 @@ from gradsflow.utility.common import module_to_cls_index
 
 _tm_classes = module_to_cls_index(torchmetrics, lower_key=False)
 
-metrics_classes: Dict[str, Metric] = {k: v for k, v in _tm_classes.items() if 65 <= ord(k[0]) <= 90}
-metrics_classes = {k.lower(): v for k, v in metrics_classes.items()}
+metrics_classes: Mapping[str, Metric] = MappingProxyType(
+    {k.lower(): v for k, v in _tm_classes.items() if 65 <= ord(k[0]) <= 90}
+)
 
 
 class MetricsContainer:
     def __init__(self, device):
         self._device = device
         self._metrics: MetricCollection = MetricCollection([])
+        self._updated = False
 
     @property
     def metrics(self):
         return self._metrics
 
+    @property
+    def updated(self) -> bool:
+        """Whether metrics state has been updated since the last reset"""
+        return self._updated
+
     def compile_metrics(self, *metrics: Union[str, Metric]) -> None:
         """Initialize metrics collection and add provided `*metrics` to the container."""
         if len(self._metrics) > 0:
@@ -58,6 +66,11 @@ class MetricsContainer:
     def _update(self, preds, target):
         """Iteratively update all the `torchmetrics` value"""
         self._metrics.update(preds, target)
+        self._updated = True
+
+    def update(self, preds, target) -> None:
+        """Update the state of compiled metrics without computing their values. Call `compute()` to get the values."""
+        self._update(preds, target)
 
     def compute(self):
         return self._metrics.compute()
@@ -70,3 +83,4 @@ class MetricsContainer:
     def reset(self):
         """Reset the values of each of the compiled metrics"""
         self._metrics.reset()
+        self._updated = False
@@ -14,3 +14,4 @@
 from .autodata import AutoDataset
 from .common import random_split_dataset
 from .image import get_augmentations, get_fake_data, image_dataset_from_directory
+from .prefetcher import CUDAPrefetcher
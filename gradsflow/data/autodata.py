@@ -11,14 +11,17 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
+import inspect
+import os
 import warnings
 from typing import Callable, Dict, Optional, Union
 
 from accelerate import Accelerator
 from loguru import logger
-from torch.utils.data import DataLoader, Dataset
+from torch.utils.data import DataLoader, Dataset, DistributedSampler, IterableDataset
 
 from gradsflow.data.base import BaseAutoDataset
+from gradsflow.data.common import move_to_device, rebuild_dataloader
 from gradsflow.utility.imports import is_installed
 
 from ..utility.common import default_device
@@ -46,6 +49,7 @@ class AutoDataset(BaseAutoDataset, DataMixin):
     ):
         super().__init__()
         self.device = default_device()
+        self._device_placement = True
         self.setup(
             train_dataloader,
             val_dataloader,
@@ -129,13 +133,80 @@ class AutoDataset(BaseAutoDataset, DataMixin):
         logger.debug("setting device setup=True")
         self.meta["device_setup_status"] = value
 
-    def prepare_data(self, accelerator: Accelerator) -> None:
+    @staticmethod
+    def _pin_dataloader(dataloader, num_workers: Optional[int], prefetch_factor: int):
+        if not isinstance(dataloader, DataLoader) or dataloader.pin_memory:
+            return dataloader
+        num_workers = dataloader.num_workers if num_workers is None else num_workers
+        return rebuild_dataloader(
+            dataloader,
+            pin_memory=True,
+            num_workers=num_workers,
+            persistent_workers=True,
+            prefetch_factor=prefetch_factor,
+        )
+
+    def enable_pin_memory(self, num_workers: Optional[int] = None, prefetch_factor: int = 4) -> None:
+        """
+        Re-create the dataloaders which are not using pinned memory with `pin_memory=True`, so that host to CUDA
+        copies can be done with DMA and `non_blocking=True`. Workers are kept alive across epochs.
+        Must be called before `prepare_data`.
+        Args:
+            num_workers: number of workers, defaults to the number of workers of each dataloader
+            prefetch_factor: number of batches loaded in advance by each worker
+        """
+        if self.device_setup_status:
+            logger.debug("data already prepared, skipped pinning memory")
+            return
+        self._train_dataloader = self._pin_dataloader(self._train_dataloader, num_workers, prefetch_factor)
+        self._val_dataloader = self._pin_dataloader(self._val_dataloader, num_workers, prefetch_factor)
+
+    def distribute_train_dataloader(self, num_replicas: int, rank: int, num_workers: Optional[int] = None) -> None:
+        """
+        Re-create train dataloader with `DistributedSampler`, so that each process trains on its own shard of the
+        dataset. Workers are kept alive across epochs. Call `sampler.set_epoch(epoch)` to shuffle every epoch.
+        Args:
+            num_replicas: number of processes, i.e. world size
+            rank: rank of the current process
+            num_workers: number of workers, defaults to `max(2, os.cpu_count() // num_replicas)` capped at 8
+        """
+        dataloader = self._train_dataloader
+        if not isinstance(dataloader, DataLoader) or isinstance(dataloader.sampler, DistributedSampler):
+            return
+        if isinstance(dataloader.dataset, IterableDataset) or dataloader.batch_size is None:
+            logger.warning("train dataloader with IterableDataset or batch_sampler is not sharded across processes!")
+            return
+        if num_workers is None:
+            num_workers = min(8, max(2, (os.cpu_count() or 1) // num_replicas))
+        sampler = DistributedSampler(
+            dataloader.dataset, num_replicas=num_replicas, rank=rank, shuffle=True, drop_last=True
+        )
+        self._train_dataloader = rebuild_dataloader(
+            dataloader, sampler=sampler, num_workers=num_workers, persistent_workers=True
+        )
+        self._train_dataloader_length = len(self._train_dataloader)
+
+    def prepare_data(self, accelerator: Accelerator, device_placement: bool = True) -> None:
+        """
+        Prepare the dataloaders with `accelerator`.
+        Args:
+            accelerator: HF Accelerator
+            device_placement: If False, batches are left on host so that the caller can copy them asynchronously,
+                e.g. with `CUDAPrefetcher`
+        """
+        self._device_placement = device_placement
         if accelerator is None:
             warnings.warn("Accelerator is None, skipped data preparation!")
             return
-        self._train_dataloader = accelerator.prepare_data_loader(self._train_dataloader)
+        prepare_kwargs = {}
+        if not device_placement:
+            if "device_placement" in inspect.signature(accelerator.prepare_data_loader).parameters:
+                prepare_kwargs["device_placement"] = False
+            else:
+                logger.debug("accelerate does not support disabling dataloader device placement")
+        self._train_dataloader = accelerator.prepare_data_loader(self._train_dataloader, **prepare_kwargs)
         if self._val_dataloader:
-            self._val_dataloader = accelerator.prepare_data_loader(self._val_dataloader)
+            self._val_dataloader = accelerator.prepare_data_loader(self._val_dataloader, **prepare_kwargs)
         self.device_setup_status = True
         self.device = accelerator.device
 
@@ -146,16 +217,19 @@ class AutoDataset(BaseAutoDataset, DataMixin):
             data: Single dataset batch
             device_mapper: Function to move data to device
         """
-        if self.device_setup_status:
+        if self.device_setup_status or data is None:
             return data
-        if device_mapper:
-            data = map(device_mapper, data, self._default_device)
+        if device_mapper and self._device_placement:
+            data = map(device_mapper, data)
         return data
 
+    def _to_device(self, batch):
+        return move_to_device(batch, self.device)
+
     @property
     def train_dataloader(self):
-        return self._fetch(self._train_dataloader, self.send_to_device)
+        return self._fetch(self._train_dataloader, self._to_device)
 
     @property
     def val_dataloader(self):
-        return self._fetch(self._val_dataloader, self.send_to_device)
+        return self._fetch(self._val_dataloader, self._to_device)
@@ -12,9 +12,23 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
-from typing import List
+import inspect
+from typing import Any, List, Union
 
-from torch.utils.data import Dataset, random_split
+import torch
+from loguru import logger
+from torch.utils.data import DataLoader, Dataset, IterableDataset, random_split
+
+# arguments such as `persistent_workers`, `prefetch_factor` (torch 1.7) and `pin_memory_device` depend on torch version
+_DATALOADER_ARGS = frozenset(inspect.signature(DataLoader.__init__).parameters)
+# DataLoader attributes which are copied when available
+_OPTIONAL_DATALOADER_ATTRS = (
+    "generator",
+    "multiprocessing_context",
+    "pin_memory_device",
+    "persistent_workers",
+    "prefetch_factor",
+)
 
 
 def random_split_dataset(data: Dataset, pct=0.9) -> List[Dataset]:
@@ -28,3 +42,65 @@ def random_split_dataset(data: Dataset, pct=0.9) -> List[Dataset]:
     split_1 = int(n * pct)
     split_2 = n - split_1
     return random_split(data, (split_1, split_2))
+
+
+def move_to_device(data: Any, device: Union[str, torch.device], non_blocking: bool = False) -> Any:
+    """
+    Recursively moves every `torch.Tensor` in a (nested) list, tuple or dict batch to `device`.
+    Values which are not tensors are returned as it is.
+    Args:
+        data: Single dataset batch
+        device: target device
+        non_blocking: copy asynchronously w.r.t. host if possible, only applied when `device` is CUDA.
+    """
+    if torch.is_tensor(data):
+        non_blocking = non_blocking and torch.device(device).type == "cuda"
+        return data.to(device, non_blocking=non_blocking)
+    if isinstance(data, (list, tuple)):
+        return [move_to_device(e, device, non_blocking) for e in data]
+    if isinstance(data, dict):
+        return {k: move_to_device(v, device, non_blocking) for k, v in data.items()}
+    return data
+
+
+def rebuild_dataloader(dataloader: DataLoader, **kwargs) -> DataLoader:
+    """
+    Re-create a `DataLoader` over the same dataset, keeping its batching, collate and worker configuration.
+    Arguments not supported by the installed torch version are dropped.
+    Args:
+        dataloader: torch DataLoader to rebuild
+        **kwargs: DataLoader arguments to override, e.g. `pin_memory=True`
+    """
+    config = {
+        "batch_size": dataloader.batch_size,
+        "drop_last": dataloader.drop_last,
+        "num_workers": dataloader.num_workers,
+        "collate_fn": dataloader.collate_fn,
+        "pin_memory": dataloader.pin_memory,
+        "timeout": dataloader.timeout,
+        "worker_init_fn": dataloader.worker_init_fn,
+    }
+    for name in _OPTIONAL_DATALOADER_ATTRS:
+        if hasattr(dataloader, name):
+            config[name] = getattr(dataloader, name)
+    custom_batch_sampler = dataloader.batch_size is None and dataloader.batch_sampler is not None
+    if isinstance(dataloader.dataset, IterableDataset):
+        logger.debug("IterableDataset does not use sampler")
+    elif custom_batch_sampler and "sampler" not in kwargs:
+        # batch_sampler is mutually exclusive with batch_size, drop_last and sampler
+        config.pop("batch_size")
+        config.pop("drop_last")
+        config["batch_sampler"] = dataloader.batch_sampler
+    else:
+        config["sampler"] = dataloader.sampler
+    config.update(kwargs)
+    if not config["num_workers"]:
+        # these arguments are only valid with multiprocess data loading
+        config.pop("persistent_workers", None)
+        config.pop("prefetch_factor", None)
+    unsupported = config.keys() - _DATALOADER_ARGS
+    if unsupported:
+        logger.debug(f"DataLoader does not support {sorted(unsupported)} in this torch version")
+        for name in unsupported:
+            config.pop(name)
+    return DataLoader(dataloader.dataset, **config)
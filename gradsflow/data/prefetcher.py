@@ -0,0 +1,85 @@
+#  Copyright (c) 2022 GradsFlow. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+from typing import Any, Iterable, Union
+
+import torch
+
+from gradsflow.data.common import move_to_device
+
+
+def _record_stream(data: Any, stream: "torch.cuda.Stream") -> None:
+    if torch.is_tensor(data):
+        data.record_stream(stream)
+    elif isinstance(data, (list, tuple)):
+        for e in data:
+            _record_stream(e, stream)
+    elif isinstance(data, dict):
+        for v in data.values():
+            _record_stream(v, stream)
+
+
+class CUDAPrefetcher:
+    """
+    Wraps a dataloader and copies the next batch to CUDA `device` on a side stream while the current batch is being
+    consumed, so that host to device transfer overlaps with compute. Works best with `pin_memory=True` dataloaders
+    which are not placed on device, see `AutoDataset.prepare_data(device_placement=False)`.
+    Inspired from NVIDIA APEX.
+    Ref: https://github.com/NVIDIA/apex/blob/master/examples/imagenet/main_amp.py
+
+    Args:
+        dataloader: Iterable of list or dict batches
+        device: CUDA device to which batches are sent
+    """
+
+    def __init__(self, dataloader: Iterable, device: Union[str, torch.device]):
+        self.dataloader = dataloader
+        self.device = torch.device(device)
+        self.stream = None
+        self.loader = None
+        self.batch = None
+
+    def __len__(self):
+        return len(self.dataloader)
+
+    def __iter__(self):
+        self.stream = torch.cuda.Stream(device=self.device)
+        self.loader = iter(self.dataloader)
+        self.preload()
+        return self
+
+    def __next__(self):
+        return self.next()
+
+    def preload(self):
+        """Fetch the next batch and issue its copy to `device` on the side stream. The dataloader is advanced
+        inside the side stream as well, so that a loader which places batches on device by itself (like
+        Accelerate `DataLoaderShard`) does not copy on the default stream."""
+        with torch.cuda.stream(self.stream):
+            try:
+                batch = next(self.loader)
+            except StopIteration:
+                self.batch = None
+                return
+            self.batch = move_to_device(batch, self.device, non_blocking=True)
+
+    def next(self):
+        """Wait for the pending copy, hand over the batch to the current stream and start loading the next one."""
+        current_stream = torch.cuda.current_stream(self.device)
+        current_stream.wait_stream(self.stream)
+        batch = self.batch
+        if batch is None:
+            raise StopIteration
+        _record_stream(batch, current_stream)
+        self.preload()
+        return batch
@@ -11,20 +11,29 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
+import contextlib
 import os
 from dataclasses import dataclass
+from types import MappingProxyType
 from typing import Any, Callable, List, Optional, Union
 
 import smart_open
 import torch
-from accelerate import Accelerator
+from accelerate import Accelerator, DistributedDataParallelKwargs
+from loguru import logger
 from torch import nn
+from torch.nn.parallel import DistributedDataParallel
 
 from gradsflow.models.tracker import Tracker
-from gradsflow.models.utils import losses
+from gradsflow.models.utils import ddp_bucket_cap_mb, losses
 from gradsflow.utility.common import default_device, module_to_cls_index
 
-_OPTIMIZER_INDEX = module_to_cls_index(torch.optim, True)
+_OPTIMIZER_INDEX = MappingProxyType(module_to_cls_index(torch.optim, True))
+_OPTIMIZER_CLASSES = frozenset(_OPTIMIZER_INDEX.values())
+
+# `static_graph` requires that the set of parameters used in `forward` does not change between iterations
+_DDP_KWARGS = {"gradient_as_bucket_view": True, "static_graph": True, "find_unused_parameters": False}
+_DDP_COMM_HOOKS = {"fp16": "fp16_compress_hook", "bf16": "bf16_compress_hook"}
 
 
 @dataclass(init=False)
@@ -47,8 +56,9 @@ class Base:
     def _get_loss(loss: Union[str, Callable], loss_config: dict) -> Optional[Callable]:
         loss_fn = None
         if isinstance(loss, str):
-            loss_fn = losses.get(loss)(**loss_config)
-            assert loss_fn is not None, f"loss {loss} is not available! Available losses are {tuple(losses.keys())}"
+            loss_cls = losses.get(loss)
+            assert loss_cls is not None, f"loss {loss} is not available! Available losses are {tuple(losses.keys())}"
+            loss_fn = loss_cls(**loss_config)
         elif isinstance(loss, type):  # when loss is a class
             loss_fn = loss(**loss_config)
         elif callable(loss):
@@ -65,7 +75,7 @@ class Base:
             ), f"optimizer {optimizer} is not available! Available optimizers are {tuple(_OPTIMIZER_INDEX.keys())}"
 
         elif callable(optimizer):
-            assert optimizer in tuple(_OPTIMIZER_INDEX.values()), f"Unknown Optimizer {type(optimizer)}"
+            assert optimizer in _OPTIMIZER_CLASSES, f"Unknown Optimizer {type(optimizer)}"
             optimizer_fn = optimizer
         else:
             raise NotImplementedError(f"Unknown optimizer {optimizer}")
@@ -103,12 +113,39 @@ class BaseModel(Base):
         accelerator_config: dict = None,
     ):
         self.accelerator = None
+        self._ddp_comm_hook: Optional[str] = None
         super().__init__()
-        self._set_accelerator(device, use_accelerate, accelerator_config)
+        self._set_accelerator(device, use_accelerate, accelerator_config, learner)
         self.learner = self.prepare_model(learner)
 
-    def _set_accelerator(self, device: Optional[str], use_accelerate: bool, accelerator_config: dict):
+    @staticmethod
+    def _add_ddp_kwargs(
+        accelerator_config: Optional[dict], learner: Optional[Union[nn.Module, List[nn.Module]]] = None
+    ) -> dict:
+        """Adds `DistributedDataParallelKwargs` handler with `_DDP_KWARGS` to the accelerator config,
+        unless one is already provided in `kwargs_handlers`. `bucket_cap_mb` is chosen from the `learner` size."""
+        accelerator_config = accelerator_config or {}
+        kwargs_handlers = list(accelerator_config.get("kwargs_handlers") or [])
+        if any(isinstance(handler, DistributedDataParallelKwargs) for handler in kwargs_handlers):
+            return accelerator_config
+
+        # older accelerate versions do not support all the DDP arguments
+        fields = DistributedDataParallelKwargs.__dataclass_fields__
+        ddp_kwargs = {k: v for k, v in _DDP_KWARGS.items() if k in fields}
+        if learner is not None:
+            ddp_kwargs["bucket_cap_mb"] = ddp_bucket_cap_mb(learner)
+        kwargs_handlers.append(DistributedDataParallelKwargs(**ddp_kwargs))
+        return {**accelerator_config, "kwargs_handlers": kwargs_handlers}
+
+    def _set_accelerator(
+        self,
+        device: Optional[str],
+        use_accelerate: bool,
+        accelerator_config: dict,
+        learner: Optional[Union[nn.Module, List[nn.Module]]] = None,
+    ):
         if use_accelerate:
+            accelerator_config = self._add_ddp_kwargs(accelerator_config, learner)
             self.accelerator = Accelerator(cpu=(device == "cpu"), **accelerator_config)
             self.device = self.accelerator.device
         else:
@@ -143,6 +180,37 @@ class BaseModel(Base):
         else:
             self.accelerator.backward(loss)
 
+    def no_sync(self):
+        """Context manager to skip gradient synchronization across processes during backward when learner is
+        wrapped with `DistributedDataParallel`, used to accumulate gradients locally."""
+        if isinstance(self.learner, DistributedDataParallel):
+            return self.learner.no_sync()
+        return contextlib.nullcontext()
+
+    def register_comm_hook(self, name: str) -> None:
+        """Compress gradients to fp16 or bf16 before AllReduce when learner is wrapped with `DistributedDataParallel`,
+        halving the communication volume. A hook can be registered only once.
+        Args:
+            name: fp16 | bf16
+        """
+        assert name in _DDP_COMM_HOOKS, f"comm hook must be one of {tuple(_DDP_COMM_HOOKS)} but got {name}"
+        register_fn = getattr(self.learner, "register_comm_hook", None)
+        if register_fn is None:
+            logger.debug("learner is not DistributedDataParallel, skipped registering comm hook")
+            return
+        if self._ddp_comm_hook is not None:
+            logger.warning(f"DDP comm hook {self._ddp_comm_hook} is already registered!")
+            return
+
+        from torch.distributed.algorithms.ddp_comm_hooks import default_hooks
+
+        hook = getattr(default_hooks, _DDP_COMM_HOOKS[name], None)
+        if hook is None:
+            logger.warning(f"{name} comm hook is not available in this PyTorch version!")
+            return
+        register_fn(state=None, hook=hook)
+        self._ddp_comm_hook = name
+
     def eval(self):
         """Set learner to eval mode for validation"""
         self.learner.requires_grad_(False)
@@ -11,25 +11,35 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
+import contextlib
+import itertools
+import operator
 import os
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import torch
+import torch.distributed as dist
 from loguru import logger
 from torch import nn
+from torch.nn.parallel import DistributedDataParallel
 from torchmetrics import Metric
 
 from gradsflow.callbacks import CallbackRunner, ProgressCallback, TrainEvalCallback
 from gradsflow.callbacks.base import Callback
 from gradsflow.core.metrics import MetricsContainer
 from gradsflow.data import AutoDataset
+from gradsflow.data.common import move_to_device
 from gradsflow.data.mixins import DataMixin
-from gradsflow.models.base import BaseModel
+from gradsflow.data.prefetcher import CUDAPrefetcher
+from gradsflow.models.base import _OPTIMIZER_INDEX, BaseModel
 from gradsflow.models.exceptions import EpochCancel, FitCancel
 from gradsflow.models.tracker import Tracker
-from gradsflow.utility.common import listify, module_to_cls_index
+from gradsflow.utility.common import listify
 
 METRICS_TYPE = Union[str, Metric, List[Union[str, Metric]], None]
+_AUTOCAST_DTYPES = {"bf16": torch.bfloat16, "fp16": torch.float16}
+# inference_mode is available from PyTorch 1.9
+_inference_mode = getattr(torch, "inference_mode", torch.no_grad)
 
 
 class Model(BaseModel, DataMixin):
@@ -43,13 +53,18 @@ class Model(BaseModel, DataMixin):
     model.fit(autodataset)
     ```
 
+    In distributed training the learner is wrapped with `DistributedDataParallel(gradient_as_bucket_view=True,
+    static_graph=True, find_unused_parameters=False)`. `static_graph` requires that `forward` does not have conditional
+    branches over parameters, else provide your own `DistributedDataParallelKwargs` in
+    `accelerator_config["kwargs_handlers"]`.
+
     Args:
         learner: Trainable model
         accelerator_config: HuggingFace Accelerator config
     """
 
     TEST = os.environ.get("GF_CI", "false").lower() == "true"
-    _OPTIMIZER_INDEX = module_to_cls_index(torch.optim, True)
+    _OPTIMIZER_INDEX = _OPTIMIZER_INDEX
 
     def __init__(
         self,
@@ -69,13 +84,27 @@ class Model(BaseModel, DataMixin):
         self.autodataset: Optional[AutoDataset] = None
         self.callback_runner: CallbackRunner = CallbackRunner(self, TrainEvalCallback(self))
         self.disable_auto_optimization = False
+        self.non_blocking = False
+        self.gradient_accumulation_steps = 1
+        self.sync_gradients = True
+        self.zero_grad_set_to_none = True
         self.metrics: MetricsContainer = MetricsContainer(self.device)
-
-    def forward_once(self, x) -> torch.Tensor:
+        self._step_fn: Callable = self._step_impl
+        self._fetch_inputs: Callable = self.fetch_inputs
+        self._fetch_target: Callable = self.fetch_target
+        self.precision = "fp32"
+        self._scaler: Optional["torch.cuda.amp.GradScaler"] = None
+
+    @contextlib.contextmanager
+    def _forward_events(self):
+        """Calls `on_forward_start` and `on_forward_end` callbacks around the forward pass."""
         self.callback_runner.on_forward_start()
-        x = self.forward(x)
+        yield
         self.callback_runner.on_forward_end()
-        return x
+
+    def forward_once(self, x) -> torch.Tensor:
+        with self._forward_events():
+            return self.forward(x)
 
     def compile(
         self,
@@ -85,6 +114,12 @@ class Model(BaseModel, DataMixin):
         metrics: METRICS_TYPE = None,
         loss_config: Optional[dict] = None,
         optimizer_config: Optional[dict] = None,
+        gradient_accumulation_steps: int = 1,
+        compile_step: bool = False,
+        precision: str = "fp32",
+        ddp_comm_hook: Optional[str] = None,
+        shard_optimizer: bool = True,
+        zero_grad_set_to_none: bool = True,
     ) -> None:
         """
         Compile loss function, optimizer and metrics
@@ -111,86 +146,232 @@ class Model(BaseModel, DataMixin):
             metrics: list of metrics to calculate. See `available_metrics()`
             loss_config: Dict config if any to pass to loss function
             optimizer_config: Dict config if any to pass to Optimizer
+            gradient_accumulation_steps: Number of steps to accumulate gradients before updating weights
+            compile_step: Compile forward and loss computation with `torch.compile(mode="reduce-overhead")` to fuse
+                kernels. Requires PyTorch >= 2.0 and CUDA.
+            precision: fp32 | bf16 | fp16. With bf16 or fp16, train and val steps run under `torch.autocast` on
+                CUDA. fp16 also scales the loss with `torch.cuda.amp.GradScaler` during auto optimization, custom
+                training steps can use `model.backward(model.scale_loss(loss))` and `model.optimizer_step()`.
+            ddp_comm_hook: fp16 | bf16 | None. Compress gradients before AllReduce in distributed training.
+            shard_optimizer: Shard optimizer states across processes with `ZeroRedundancyOptimizer` (ZeRO-1) when the
+                learner is wrapped with `DistributedDataParallel`. Use `optimizer.consolidate_state_dict()` before
+                saving optimizer state.
+            zero_grad_set_to_none: Set gradients to None instead of filling them with zeros on `zero_grad`,
+                needs torch>=1.7
         """
         loss_config = loss_config or {}
         optimizer_config = optimizer_config or {}
+        assert gradient_accumulation_steps >= 1, "gradient_accumulation_steps must be >= 1"
+        self.gradient_accumulation_steps = gradient_accumulation_steps
+        self.zero_grad_set_to_none = zero_grad_set_to_none
+        assert precision in ("fp32", *_AUTOCAST_DTYPES), f"precision must be fp32 | bf16 | fp16 but got {precision}"
+        self.precision = precision
+        self._scaler = self._get_grad_scaler()
 
         if optimizer:
             optimizer_fn = self._get_optimizer(optimizer)
-            optimizer = optimizer_fn(self.learner.parameters(), lr=learning_rate, **optimizer_config)
+            optimizer = self._build_optimizer(optimizer_fn, learning_rate, optimizer_config, shard_optimizer)
             self.optimizer = self.prepare_optimizer(optimizer)
         if loss:
             self.loss = self._get_loss(loss, loss_config)
         self.metrics.compile_metrics(*listify(metrics))
+        self._step_fn = self._compile_step() if compile_step else self._step_impl
+        if ddp_comm_hook:
+            self.register_comm_hook(ddp_comm_hook)
         self._compiled = True
 
-    def step(self, batch: Union[List[torch.Tensor], Dict[Any, torch.Tensor]]) -> Dict[str, torch.Tensor]:
-        inputs = self.fetch_inputs(batch)
-        target = self.fetch_target(batch)
-        logits = self.forward_once(inputs)
+    def _build_optimizer(
+        self, optimizer_fn: Callable, learning_rate: float, optimizer_config: dict, shard: bool
+    ) -> torch.optim.Optimizer:
+        params = self.learner.parameters()
+        if shard and isinstance(self.learner, DistributedDataParallel) and dist.get_world_size() > 1:
+            from torch.distributed.optim import ZeroRedundancyOptimizer
+
+            logger.debug(f"sharding optimizer state across {dist.get_world_size()} processes")
+            return ZeroRedundancyOptimizer(params, optimizer_class=optimizer_fn, lr=learning_rate, **optimizer_config)
+        return optimizer_fn(params, lr=learning_rate, **optimizer_config)
+
+    def _get_grad_scaler(self) -> Optional["torch.cuda.amp.GradScaler"]:
+        if self.precision != "fp16" or torch.device(self.device).type != "cuda":
+            return None
+        if getattr(self.accelerator, "scaler", None) is not None:
+            logger.warning("Accelerator already scales the gradients, GradScaler will not be used!")
+            return None
+        return torch.cuda.amp.GradScaler()
+
+    def _autocast(self):
+        """Mixed precision context for `precision` bf16 | fp16 when running on CUDA."""
+        if self.precision == "fp32" or torch.device(self.device).type != "cuda":
+            return contextlib.nullcontext()
+        return torch.autocast(device_type="cuda", dtype=_AUTOCAST_DTYPES[self.precision])
+
+    def scale_loss(self, loss: torch.Tensor) -> torch.Tensor:
+        """Scale loss with GradScaler for fp16 precision, loss is returned as it is otherwise.
+        Gradients of a scaled loss must be applied with `optimizer_step`."""
+        if self._scaler is None:
+            return loss
+        return self._scaler.scale(loss)
+
+    def optimizer_step(self):
+        """Update weights with `optimizer.step()`, through GradScaler for fp16 precision.
+        Pairs with `model.backward(model.scale_loss(loss))`."""
+        if self._scaler is None:
+            self.optimizer.step()
+            return
+        self._scaler.step(self.optimizer)
+        self._scaler.update()
+
+    def _compile_step(self) -> Callable:
+        if not hasattr(torch, "compile"):
+            logger.warning("torch.compile requires PyTorch >= 2.0, step will not be compiled!")
+            return self._step_impl
+        if not torch.cuda.is_available():
+            logger.warning("CUDA is not available, step will not be compiled!")
+            return self._step_impl
+        return torch.compile(self._step_impl, mode="reduce-overhead", fullgraph=False)
+
+    def _step_impl(self, inputs, target) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Tensor computations of a step, free of callbacks so that it can be compiled with `torch.compile`."""
+        logits = self.forward(inputs)
         loss = self.loss(logits, target)
-        return {"loss": loss, "metrics": self.metrics.calculate_metrics(logits, target)}
+        return logits, loss
+
+    def step(self, batch: Union[List[torch.Tensor], Dict[Any, torch.Tensor]]) -> Dict[str, torch.Tensor]:
+        inputs = move_to_device(self._fetch_inputs(batch), self.device, self.non_blocking)
+        target = move_to_device(self._fetch_target(batch), self.device, self.non_blocking)
+        # callbacks stay outside of `_step_fn`, so that it can be compiled
+        with self._forward_events():
+            logits, loss = self._step_fn(inputs, target)
+        # metrics are computed once per epoch by TrainEvalCallback
+        self.metrics.update(logits, target)
+        return {"loss": loss}
 
     def train_step(self, batch: Union[List[torch.Tensor], Dict[Any, torch.Tensor]]) -> Dict[str, torch.Tensor]:
-        return self.step(batch)
+        with self._autocast():
+            return self.step(batch)
 
     def val_step(self, batch: Union[List[torch.Tensor], Dict[Any, torch.Tensor]]) -> Dict[str, torch.Tensor]:
-        return self.step(batch)
+        with self._autocast():
+            return self.step(batch)
 
     def train_one_epoch(self, train_dataloader):
         """Train model for a single epoch with `train_dataloader`. `CallbackRunner` will call
         `on_train_step_*` method for each training step.
         Training will break if `step >= steps_per_epoch`.
+        With gradient accumulation, gradients are synchronized across processes and the optimizer steps only on the
+        last step of each accumulation window or of the epoch, which is marked by `Model.sync_gradients`.
+        If the dataloader has no length, the last step is unknown, so gradients are synchronized on every step.
         """
         tracker = self.tracker
         steps_per_epoch = tracker.steps_per_epoch
-
-        for step, batch in enumerate(train_dataloader):
+        accumulation_steps = self.gradient_accumulation_steps
+        # the last step is trained when `step == steps_per_epoch`
+        max_steps = steps_per_epoch + 1 if steps_per_epoch else None
+        if self.TEST:
+            max_steps = 1
+
+        # bind attributes used in the loop to locals
+        train_state = tracker.train
+        on_step_start = self.callback_runner.on_train_step_start
+        on_step_end = self.callback_runner.on_train_step_end
+        train_step = self.train_step
+        no_sync = self.no_sync
+        nullcontext = contextlib.nullcontext
+        num_steps = self._epoch_length(train_dataloader, max_steps)
+
+        self.sync_gradients = True
+        for step, batch in enumerate(itertools.islice(train_dataloader, max_steps)):
             tracker.global_step += 1
-            tracker.train.steps = step
+            train_state.steps = step
+            self.sync_gradients = (step + 1) % accumulation_steps == 0 or step + 1 == num_steps
+            sync_context = nullcontext() if self.sync_gradients or num_steps is None else no_sync()
             # ----- TRAIN STEP -----
-            self.callback_runner.on_train_step_start()
-            outputs = self.train_step(batch)
-            self.callback_runner.on_train_step_end(data=batch, outputs=outputs)
-            if self.TEST:
-                break
-            if steps_per_epoch and step >= steps_per_epoch:
-                break
+            with sync_context:
+                on_step_start()
+                outputs = train_step(batch)
+                on_step_end(data=batch, outputs=outputs)
+
+    @staticmethod
+    def _epoch_length(dataloader, max_steps: Optional[int]) -> Optional[int]:
+        """Number of steps in an epoch or None if the dataloader has no length."""
+        try:
+            length = len(dataloader)
+        except TypeError:
+            return None
+        return length if max_steps is None else min(length, max_steps)
 
     def val_one_epoch(self, val_dataloader):
         """Validate model for a single epoch with `val_dataloader`. `CallbackRunner` will call
         `on_val_step_*` method for each validation step.
         """
         tracker = self.tracker
-        for step, batch in enumerate(val_dataloader):
-            tracker.val.steps = step
+        max_steps = 1 if self.TEST else None
+        # bind attributes used in the loop to locals
+        val_state = tracker.val
+        on_step_start = self.callback_runner.on_val_step_start
+        on_step_end = self.callback_runner.on_val_step_end
+        val_step = self.val_step
+
+        for step, batch in enumerate(itertools.islice(val_dataloader, max_steps)):
+            val_state.steps = step
             # ----- VAL STEP -----
-            self.callback_runner.on_val_step_start()
-            outputs = self.val_step(batch)
-            self.callback_runner.on_val_step_end(data=batch, outputs=outputs)
-            if self.TEST:
-                break
+            on_step_start()
+            outputs = val_step(batch)
+            on_step_end(data=batch, outputs=outputs)
+
+    def _bind_fetchers(self):
+        """Resolve batch extractors used in `step` once. Default `fetch_inputs`/`fetch_target` index the batch with
+        `INPUT_KEY`/`OUTPUT_KEY` for both list and dict batches, so they are replaced by `operator.itemgetter`.
+        Methods overridden in a subclass or on the instance are used as it is."""
+        cls, attrs = type(self), vars(self)
+        if "fetch_inputs" not in attrs and cls.fetch_inputs is DataMixin.fetch_inputs:
+            self._fetch_inputs = operator.itemgetter(self.INPUT_KEY)
+        else:
+            self._fetch_inputs = self.fetch_inputs
+        if "fetch_target" not in attrs and cls.fetch_target is DataMixin.fetch_target:
+            self._fetch_target = operator.itemgetter(self.OUTPUT_KEY)
+        else:
+            self._fetch_target = self.fetch_target
+
+    def _prefetch(self, dataloader):
+        """Wrap `dataloader` with `CUDAPrefetcher` to overlap host to device copy with compute on CUDA."""
+        if torch.device(self.device).type != "cuda":
+            return dataloader
+        return CUDAPrefetcher(dataloader, self.device)
 
     def _train_epoch_with_event(self):
-        train_dataloader = self.autodataset.train_dataloader
+        sampler = getattr(self.autodataset._train_dataloader, "sampler", None)
+        if hasattr(sampler, "set_epoch"):
+            sampler.set_epoch(self.tracker.current_epoch)  # reshuffle DistributedSampler every epoch
+        train_dataloader = self._prefetch(self.autodataset.train_dataloader)
         # ----- TRAIN -----
         self.callback_runner.on_train_epoch_start()
         self.train_one_epoch(train_dataloader)
         self.callback_runner.on_train_epoch_end()
 
     def _val_epoch_with_event(self):
-        autodataset = self.autodataset
-        if not autodataset.val_dataloader:
-            return
-        val_dataloader = self.autodataset.val_dataloader
+        """Validate if `autodataset` has val_dataloader. `fit` replaces it with the specialized
+        `_val_epoch_with_event_impl` or `_skip_val_epoch`, so that the check is not done every epoch."""
+        if self.autodataset.val_dataloader:
+            self._val_epoch_with_event_impl()
+
+    @staticmethod
+    def _skip_val_epoch():
+        """No validation data"""
+
+    def _val_epoch_with_event_impl(self):
+        val_dataloader = self._prefetch(self.autodataset.val_dataloader)
         # ------ VALIDATE -----
         self.callback_runner.on_val_epoch_start()
-        self.val_one_epoch(val_dataloader)
+        with _inference_mode():
+            self.val_one_epoch(val_dataloader)
         self.callback_runner.on_val_epoch_end()
 
     def epoch(self):
         """Train & Validate Model for specified number of epochs with `on_epoch_*` callback method."""
         current_epoch, max_epochs = self.tracker.current_epoch, self.tracker.max_epochs
+        if self.TEST:
+            max_epochs = min(max_epochs, current_epoch + 1)
 
         for epoch in range(current_epoch, max_epochs):
             # ----- EPOCH -----
@@ -201,9 +382,6 @@ class Model(BaseModel, DataMixin):
 
             self.tracker.current_epoch = epoch + 1  # update epoch
 
-            if self.TEST:
-                break
-
     def _fit_with_event(self):
         self.callback_runner.on_fit_start()
         self.callback_runner.with_event("epoch", self.epoch, EpochCancel)
@@ -218,6 +396,9 @@ class Model(BaseModel, DataMixin):
         resume: bool = True,
         show_progress: bool = True,
         progress_kwargs=None,
+        pin_memory: bool = True,
+        non_blocking: bool = True,
+        num_workers: Optional[int] = None,
     ) -> Tracker:
         """
         Analogous to Keras model.fit(...) API, it trains the model for specified epochs and returns Tracker object
@@ -237,13 +418,30 @@ class Model(BaseModel, DataMixin):
             resume: Resume training from the last current_epoch
             show_progress: Enable to show training progress
             progress_kwargs: Arguments for rich.progress
+            pin_memory: Rebuild the dataloaders with pinned memory when training on CUDA
+            non_blocking: Copy batches to CUDA device asynchronously
+            num_workers: Number of workers of the train dataloader when it is sharded for `DistributedDataParallel`,
+                see `AutoDataset.distribute_train_dataloader`
 
         Returns:
             Tracker object
         """
         self.assert_compiled()
         self.autodataset = autodataset
-        self.autodataset.prepare_data(self.accelerator)
+        if self.accelerator is None and isinstance(self.learner, DistributedDataParallel):
+            # Accelerator shards the dataloaders in `prepare_data`
+            self.autodataset.distribute_train_dataloader(dist.get_world_size(), dist.get_rank(), num_workers)
+        on_cuda = torch.device(self.device).type == "cuda"
+        if pin_memory and on_cuda:
+            self.autodataset.enable_pin_memory()
+        # on CUDA batches are copied asynchronously by `CUDAPrefetcher` instead of the dataloader
+        self.autodataset.prepare_data(self.accelerator, device_placement=not on_cuda)
+        self.non_blocking = non_blocking
+        self._bind_fetchers()
+        if self.autodataset.val_dataloader:
+            self._val_epoch_with_event = self._val_epoch_with_event_impl
+        else:
+            self._val_epoch_with_event = self._skip_val_epoch
 
         if not resume:
             self.tracker.reset()
@@ -12,8 +12,10 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
+import torch
 from loguru import logger
 from rich import box
 from rich.table import Table
@@ -21,6 +23,16 @@ from rich.table import Table
 from gradsflow.core.base import TrackingValues
 from gradsflow.utility.common import GDict, to_item
 
+_LOG_CAPACITY = 1024
+
+
+def _format_cell(value: Any) -> str:
+    return format(value, " .3f") if isinstance(value, float) else str(value)
+
+
+def _is_scalar(value: Any) -> bool:
+    return isinstance(value, (int, float, np.number)) or (isinstance(value, np.ndarray) and value.ndim == 0)
+
 
 @dataclass(init=False)
 class BaseTracker:
@@ -40,7 +52,9 @@ class Tracker(BaseTracker):
     def __init__(self):
         self.train.metrics = GDict()
         self.val.metrics = GDict()
-        self.logs: List[Dict] = []
+        self._reset_logs()
+        self._table: Optional[Table] = None
+        self._table_data: Optional[Tuple] = None
 
     def __getitem__(self, key: str):  # skipcq: PYL-R1705
         """
@@ -86,12 +100,93 @@ class Tracker(BaseTracker):
 
         raise KeyError(f"mode {mode} is not implemented!")
 
-    def _append_logs(self, key, value):
+    def _reset_logs(self, capacity: int = _LOG_CAPACITY):
+        """Logs are stored column wise in pre-allocated arrays of epoch, key id and value.
+        Non scalar values are kept in `_log_objects` by index with a NaN placeholder in the value column."""
+        self._log_idx = 0
+        self._log_epoch = np.empty(capacity, dtype=np.int32)
+        self._log_key = np.empty(capacity, dtype=np.int16)
+        self._log_val = np.empty(capacity, dtype=np.float64)
+        self._log_objects: Dict[int, Any] = {}
+        self._key_to_id: Dict[str, int] = {}
+        self._keys: List[str] = []
+
+    def _grow_logs(self):
+        """Double the capacity of log arrays"""
+        capacity = 2 * len(self._log_val)
+        for name in ("_log_epoch", "_log_key", "_log_val"):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[: len(old)] = old
+            setattr(self, name, new)
+
+    @property
+    def log_columns(self) -> Dict[str, np.ndarray]:
+        """Tracked values in columnar format, `{"current_epoch": ..., "key": ..., "value": ...}` with one entry per
+        tracked value. Arrays are read-only and can be wrapped directly, e.g. `pandas.DataFrame(tracker.log_columns)`.
+        """
+        n = self._log_idx
+        values = self._log_val[:n]
+        if self._log_objects:
+            values = values.astype(object)
+            for idx, value in self._log_objects.items():
+                values[idx] = value
+        columns = {
+            "current_epoch": self._log_epoch[:n],
+            "key": np.asarray(self._keys, dtype=object)[self._log_key[:n]],
+            "value": values,
+        }
+        for column in columns.values():
+            column.flags.writeable = False
+        return columns
+
+    @property
+    def logs(self) -> List[Dict]:
+        """List of `{"current_epoch": epoch, key: value}` for each of the tracked value."""
+        n = self._log_idx
+        keys = self._keys
+        epochs = self._log_epoch[:n].tolist()
+        key_ids = self._log_key[:n].tolist()
+        values = self._log_val[:n].tolist()
+        for idx, value in self._log_objects.items():
+            values[idx] = value
+        return [{"current_epoch": e, keys[k]: v} for e, k, v in zip(epochs, key_ids, values)]
+
+    def _append_logs(self, key, value, epoch: Optional[int] = None):
         """Append Key Value pairs to `Tracker.logs`"""
         # TODO: accept a list of keys and values as well.
-        epoch = self.current_epoch
-        data = {"current_epoch": epoch, key: to_item(value)}
-        self.logs.append(data)
+        key_id = self._key_to_id.get(key)
+        if key_id is None:
+            key_id = self._key_to_id[key] = len(self._keys)
+            self._keys.append(key)
+
+        idx = self._log_idx
+        if idx == len(self._log_val):
+            self._grow_logs()
+        self._log_epoch[idx] = self.current_epoch if epoch is None else epoch
+        self._log_key[idx] = key_id
+        value = to_item(value)
+        if _is_scalar(value):
+            self._log_val[idx] = value
+        else:
+            self._log_val[idx] = np.nan
+            self._log_objects[idx] = value
+        self._log_idx = idx + 1
+
+    @staticmethod
+    def _batch_to_item(values: List) -> List:
+        """Converts scalar tensors to python floats with a single device to host copy per device instead of one per
+        value."""
+        values = list(values)
+        device_to_idx: Dict[torch.device, List[int]] = {}
+        for i, v in enumerate(values):
+            if torch.is_tensor(v) and v.ndim == 0:
+                device_to_idx.setdefault(v.device, []).append(i)
+        for scalar_idx in device_to_idx.values():
+            scalars = torch.stack([values[i].detach().double() for i in scalar_idx]).cpu().tolist()
+            for i, value in zip(scalar_idx, scalars):
+                values[i] = value
+        return values
 
     def track_loss(self, loss: float, mode: str):
         """Tracks loss by adding to `Tracker.logs` and maintaining average loss in a single Epoch with `TrackingValues`.
@@ -114,6 +209,7 @@ class Tracker(BaseTracker):
             mode: can be train | val
         """
         value_tracker = self.mode(mode)
+        metric = dict(zip(metric.keys(), self._batch_to_item(list(metric.values()))))
 
         # Track values that averages with epoch
         value_tracker.update_metrics(metric)
@@ -123,7 +219,7 @@ class Tracker(BaseTracker):
             k = mode + "/" + k
             self._append_logs(k, v)
 
-    def create_table(self) -> Table:
+    def _table_rows(self) -> Tuple[Tuple[str, ...], Tuple]:
         headings = ["i", "train/loss"]
         row = [self.current_epoch, self.train_loss]
 
@@ -131,19 +227,51 @@ class Tracker(BaseTracker):
             headings.append("val/loss")
             row.append(self.val_loss)
 
-        for metric_name, value in self.train_metrics.items():
+        # list(...) takes a snapshot as the table may be rendered from rich refresh thread
+        for metric_name, value in list(self.train_metrics.items()):
             headings.append("train/" + metric_name)
             row.append(value.avg)
 
-        for metric_name, value in self.val_metrics.items():
+        for metric_name, value in list(self.val_metrics.items()):
             headings.append("val/" + metric_name)
             row.append(value.avg)
+        return tuple(headings), tuple(row)
 
-        row = list(map(lambda x: f"{x: .3f}" if isinstance(x, float) else str(x), row))
+    def create_table(self) -> Table:
+        """Creates a rich Table of the current epoch loss and metrics.
+        The table is cached and only re-created when tracked values change."""
+        data = self._table_rows()
+        if self._table is not None and data == self._table_data:
+            return self._table
+
+        headings, row = data
         table = Table(*headings, expand=True, box=box.SIMPLE)
-        table.add_row(*row)
+        table.add_row(*[_format_cell(x) for x in row])
+        self._table, self._table_data = table, data
         return table
 
+    def __rich__(self) -> Table:
+        """Render Tracker as a table, so that the table is only created when rich refreshes the display."""
+        return self.create_table()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_table"] = None  # display cache is not saved
+        return state
+
+    def __setstate__(self, state):
+        legacy_logs = state.pop("logs", None)
+        self.__dict__.update(state)
+        self._table, self._table_data = None, None
+        if "_log_idx" not in state:
+            # Tracker saved before logs were stored column wise
+            self._reset_logs()
+            for log in legacy_logs or []:
+                log = dict(log)
+                epoch = log.pop("current_epoch", 0)
+                for key, value in log.items():
+                    self._append_logs(key, value, epoch)
+
     def reset(self):
         """Resets epochs, logs and train & val `TrackingValues`."""
         logger.debug("Reset Tracker")
@@ -152,4 +280,4 @@ class Tracker(BaseTracker):
         self.steps_per_epoch = None
         self.train = TrackingValues()
         self.val = TrackingValues()
-        self.logs = []
+        self._reset_logs()
@@ -11,11 +11,13 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
-from typing import Callable, Dict, List, Optional, Union
+from types import MappingProxyType
+from typing import Callable, List, Mapping, Optional, Union
 
 import numpy as np
 import torch
 import torchmetrics
+from loguru import logger
 from torch import nn
 from torchmetrics import Metric
 
@@ -25,10 +27,12 @@ SCALAR = Union[torch.Tensor, np.float, float, int]
 _nn_classes = module_to_cls_index(nn)
 _tm_classes = module_to_cls_index(torchmetrics, lower_key=False)
 
-losses: Dict[str, Callable] = {k: v for k, v in _nn_classes.items() if "loss" in k}
+# registries are built once at import and are read-only
+losses: Mapping[str, Callable] = MappingProxyType({k: v for k, v in _nn_classes.items() if "loss" in k})
 
-metrics: Dict[str, Metric] = {k: v for k, v in _tm_classes.items() if 65 <= ord(k[0]) <= 90}
-metrics = {k.lower(): v for k, v in metrics.items()}
+metrics: Mapping[str, Metric] = MappingProxyType(
+    {k.lower(): v for k, v in _tm_classes.items() if 65 <= ord(k[0]) <= 90}
+)
 
 
 def available_losses(pattern: Optional[str] = None) -> List[str]:
@@ -59,3 +63,24 @@ def available_metrics(pattern: Optional[str] = None) -> List[str]:
     """
     metric_keys = list(metrics.keys())
     return filter_list(metric_keys, pattern)
+
+
+def ddp_bucket_cap_mb(learner: Union[nn.Module, List[nn.Module]]) -> int:
+    """Size of `DistributedDataParallel` gradient buckets in MB, based on the model size.
+    Smaller buckets let the reduction of the last bucket (first layers) overlap with backward.
+    Models with less than 200M parameters use 10 MB, more than 1B use 50 MB and in between 1/8th of the
+    parameter memory bounded to [10, 50] MB.
+    """
+    learners = learner if isinstance(learner, (list, tuple)) else [learner]
+    params = [p for m in learners if isinstance(m, nn.Module) for p in m.parameters()]
+    num_params = sum(p.numel() for p in params)
+    total_mb = sum(p.numel() * p.element_size() for p in params) / 2**20
+
+    if num_params < 200e6:
+        bucket_cap_mb = 10
+    elif num_params > 1e9:
+        bucket_cap_mb = 50
+    else:
+        bucket_cap_mb = min(50, max(10, int(total_mb // 8)))
+    logger.debug(f"DDP bucket_cap_mb={bucket_cap_mb} for {num_params} parameters ({total_mb:.1f} MB)")
+    return bucket_cap_mb
@@ -36,6 +36,18 @@ def test_append(dummy_model):
         assert isinstance(cb, Callback)
 
 
+def test_event_handlers(dummy_model):
+    cb = CallbackRunner(dummy_model)
+    assert cb._event_handlers["on_train_step_start"] == ()
+
+    training_cb = TrainEvalCallback(cb.model)
+    cb.append(training_cb)
+    assert cb._event_handlers["on_train_step_start"] == (training_cb.on_train_step_start,)
+
+    cb.clean()
+    assert cb._event_handlers["on_train_step_start"] == ()
+
+
 def test_clean(dummy_model):
     cb = CallbackRunner(dummy_model, TrainEvalCallback())
     cb.clean(keep="TrainEvalCallback")
@@ -16,7 +16,7 @@ from pathlib import Path
 import pytest
 import torch
 from accelerate import Accelerator
-from torch.utils.data import DataLoader, TensorDataset
+from torch.utils.data import DataLoader, DistributedSampler, TensorDataset
 
 from gradsflow.data import AutoDataset
 
@@ -48,3 +48,10 @@ def test_dataset():
     autodata = AutoDataset(train_dataset=data.dataset, val_dataset=data.dataset)
     autodata.prepare_data(accelerate)
     assert isinstance(autodata.train_dataloader, DataLoader)
+
+
+def test_distribute_train_dataloader():
+    autodata = AutoDataset(train_dataset=data.dataset, batch_size=2)
+    autodata.distribute_train_dataloader(num_replicas=2, rank=0, num_workers=2)
+    assert isinstance(autodata._train_dataloader.sampler, DistributedSampler)
+    assert len(autodata._train_dataloader.sampler) == len(data.dataset) // 2
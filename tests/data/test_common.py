@@ -11,7 +11,10 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
-from gradsflow.data.common import random_split_dataset
+import torch
+from torch.utils.data import DataLoader
+
+from gradsflow.data.common import move_to_device, random_split_dataset, rebuild_dataloader
 from gradsflow.data.image import get_fake_data
 
 fake_data = get_fake_data((32, 32))
@@ -21,3 +24,26 @@ def test_random_split_dataset():
     d1, d2 = random_split_dataset(fake_data.dataset, 0.9)
     assert len(d1) > len(d2)
     assert len(d1) == int(len(fake_data.dataset) * 0.9)
+
+
+def test_move_to_device():
+    assert move_to_device(1, "cpu") == 1
+
+    batch = [torch.randn(4, 1), {"target": torch.ones(4)}]
+    moved = move_to_device(batch, "cpu", non_blocking=True)
+    assert isinstance(moved[0], torch.Tensor)
+    assert moved[1]["target"].device.type == "cpu"
+
+
+def test_rebuild_dataloader():
+    dataloader = DataLoader(fake_data.dataset, batch_size=4, shuffle=True)
+    rebuilt = rebuild_dataloader(dataloader, pin_memory=True, persistent_workers=True)
+    assert rebuilt.pin_memory
+    assert rebuilt.batch_size == 4
+    assert rebuilt.sampler is dataloader.sampler
+
+    generator = torch.Generator().manual_seed(0)
+    dataloader = DataLoader(fake_data.dataset, batch_size=4, shuffle=True, generator=generator)
+    rebuilt = rebuild_dataloader(dataloader, persistent_workers=True, prefetch_factor=4)
+    assert rebuilt.generator is generator
+    assert rebuilt.num_workers == 0
@@ -0,0 +1,48 @@
+#  Copyright (c) 2022 GradsFlow. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import pytest
+import torch
+from accelerate import Accelerator
+from torch.utils.data import DataLoader, TensorDataset
+
+from gradsflow.data import AutoDataset, CUDAPrefetcher
+
+dataset = TensorDataset(torch.randn(8, 4), torch.randint(0, 2, (8,)))
+dataloader = DataLoader(dataset, batch_size=2, pin_memory=torch.cuda.is_available())
+
+
+@pytest.mark.skipif(not torch.cuda.is_available(), reason="requires CUDA")
+def test_cuda_prefetcher():
+    prefetcher = CUDAPrefetcher(dataloader, "cuda")
+    assert len(prefetcher) == len(dataloader)
+
+    batches = list(prefetcher)
+    assert len(batches) == len(dataloader)
+    for inputs, target in batches:
+        assert inputs.is_cuda
+        assert target.is_cuda
+
+
+@pytest.mark.skipif(not torch.cuda.is_available(), reason="requires CUDA")
+def test_cuda_prefetcher_prepared_dataloader():
+    autodata = AutoDataset(dataloader)
+    autodata.prepare_data(Accelerator(), device_placement=False)
+    inputs, _ = next(iter(autodata.train_dataloader))
+    assert not inputs.is_cuda
+
+    batches = list(CUDAPrefetcher(autodata.train_dataloader, "cuda"))
+    assert len(batches) == len(dataloader)
+    for inputs, target in batches:
+        assert inputs.is_cuda
+        assert target.is_cuda
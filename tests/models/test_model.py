@@ -14,8 +14,13 @@
 import pytest
 import timm
 import torch
+import torch.distributed as dist
+from accelerate import DistributedDataParallelKwargs
+from torch.nn.parallel import DistributedDataParallel
+from torch.utils.data import DataLoader, DistributedSampler, TensorDataset
 
 from gradsflow.callbacks import ModelCheckpoint
+from gradsflow.callbacks.base import Callback
 from gradsflow.data import AutoDataset
 from gradsflow.data.image import get_fake_data
 from gradsflow.models.model import Model
@@ -39,8 +44,10 @@ def test_predict(cnn_model):
     r1 = cnn_model.forward(x)
     r2 = cnn_model(x)
     r3 = cnn_model.predict(x)
+    r4 = cnn_model.forward_once(x)
     assert torch.all(torch.isclose(r1, r2))
     assert torch.all(torch.isclose(r2, r3))
+    assert torch.all(torch.isclose(r2, r4))
     assert isinstance(model.predict(torch.randn(1, 3, 64, 64)), torch.Tensor)
 
 
@@ -64,6 +71,115 @@ def test_fit(cnn_model):
     assert isinstance(tracker2, Tracker)
 
 
+def test_epoch_metrics(cnn_model):
+    cnn_model.compile(metrics="accuracy")
+    tracker = cnn_model.fit(autodataset, max_epochs=1, steps_per_epoch=1, show_progress=False)
+    assert "accuracy" in tracker.train_metrics
+    assert "accuracy" in tracker.val_metrics
+    assert not cnn_model.metrics.updated
+
+
+def test_gradient_accumulation(cnn_model):
+    cnn_model.compile(gradient_accumulation_steps=2)
+    assert cnn_model.gradient_accumulation_steps == 2
+    tracker = cnn_model.fit(autodataset, max_epochs=1, steps_per_epoch=2, show_progress=False)
+    assert isinstance(tracker, Tracker)
+
+    with pytest.raises(AssertionError):
+        cnn_model.compile(gradient_accumulation_steps=0)
+
+
+def test_gradient_accumulation_steps_optimizer():
+    class GradRecorder(Callback):
+        _name = "GradRecorder"
+
+        def __init__(self):
+            super().__init__(model=None)
+            self.grads = []
+
+        def on_train_step_end(self, *args, **kwargs):
+            self.grads.append(self.model.learner.weight.grad.clone())
+
+    linear_model = Model(torch.nn.Linear(4, 2), device="cpu")
+    # lr=0 keeps the weights fixed, so that every step has the same gradient
+    linear_model.compile("crossentropyloss", "sgd", learning_rate=0, gradient_accumulation_steps=2)
+    linear_model.TEST = False
+    optimizer_steps = []
+    optimizer_step = linear_model.optimizer_step
+    linear_model.optimizer_step = lambda: optimizer_steps.append(optimizer_step())
+
+    dataset = TensorDataset(torch.ones(5, 4), torch.zeros(5, dtype=torch.long))
+    recorder = GradRecorder()
+    linear_model.fit(AutoDataset(DataLoader(dataset)), max_epochs=1, callbacks=recorder, show_progress=False)
+
+    # windows of steps (0, 1), (2, 3) and the partial window (4,) at the end of the epoch
+    assert len(optimizer_steps) == 3
+    grads = recorder.grads
+    assert torch.allclose(grads[1], 2 * grads[0])
+    assert torch.allclose(grads[2], grads[0])
+    assert torch.allclose(grads[4], grads[0])
+
+
+def test_fit_distributed(tmp_path):
+    dist.init_process_group("gloo", init_method=f"file://{tmp_path}/store", rank=0, world_size=1)
+    try:
+        ddp_model = Model(DistributedDataParallel(torch.nn.Linear(4, 2)), device="cpu", use_accelerate=False)
+        ddp_model.compile("crossentropyloss", "sgd", gradient_accumulation_steps=2)
+        ddp_model.TEST = False
+        optimizer_steps, no_sync_steps = [], []
+        optimizer_step, no_sync = ddp_model.optimizer_step, ddp_model.no_sync
+        ddp_model.optimizer_step = lambda: optimizer_steps.append(optimizer_step())
+        ddp_model.no_sync = lambda: no_sync_steps.append(1) or no_sync()
+
+        dataset = TensorDataset(torch.randn(10, 4), torch.randint(0, 2, (10,)))
+        autodata = AutoDataset(DataLoader(dataset, batch_size=2), num_classes=2)
+        tracker = ddp_model.fit(autodata, max_epochs=2, show_progress=False, num_workers=0)
+        assert isinstance(tracker, Tracker)
+
+        sampler = autodata._train_dataloader.sampler
+        assert isinstance(sampler, DistributedSampler)
+        assert sampler.epoch == 1
+        # 5 batches per epoch: windows (0, 1), (2, 3) and the partial window (4,) applied at the epoch end
+        assert len(optimizer_steps) == 6
+        # the dataloader has no length, so the partial window is not known and every step is synchronized
+        assert not no_sync_steps
+    finally:
+        dist.destroy_process_group()
+
+
+def test_compile_step(cnn_model):
+    cnn_model.compile(compile_step=True)
+    tracker = cnn_model.fit(autodataset, max_epochs=1, steps_per_epoch=1, show_progress=False)
+    assert isinstance(tracker, Tracker)
+
+
+def test_precision(cnn_model):
+    cnn_model.compile(precision="bf16")
+    assert cnn_model.precision == "bf16"
+    loss = torch.tensor(1.0)
+    assert cnn_model.scale_loss(loss) is loss
+    tracker = cnn_model.fit(autodataset, max_epochs=1, steps_per_epoch=1, show_progress=False)
+    assert isinstance(tracker, Tracker)
+
+    with pytest.raises(AssertionError):
+        cnn_model.compile(precision="fp64")
+
+
+def test_bind_fetchers(cnn_model):
+    batch = [torch.randn(1, 3, 64, 64), torch.tensor([1])]
+    cnn_model._bind_fetchers()
+    assert cnn_model._fetch_inputs(batch) is batch[0]
+    assert cnn_model._fetch_target(batch) is batch[1]
+
+    cnn_model.INPUT_KEY, cnn_model.OUTPUT_KEY = "image", "label"
+    cnn_model._bind_fetchers()
+    assert cnn_model._fetch_target({"image": batch[0], "label": batch[1]}) is batch[1]
+
+    cnn_model.fetch_inputs = lambda data: data["image"] * 2
+    cnn_model._bind_fetchers()
+    assert torch.equal(cnn_model._fetch_inputs({"image": batch[0]}), batch[0] * 2)
+
+
 def test_compile():
     model1 = Model(cnn)
 
@@ -76,6 +192,9 @@ def test_compile():
     with pytest.raises(AssertionError):
         model1.compile("crossentropyloss", "adam", metrics="random_val")
 
+    with pytest.raises(AssertionError):
+        model1.compile("random_loss", "adam")
+
     model1.compile("crossentropyloss", "adam", metrics="accuracy")
 
     model2 = Model(cnn)
@@ -90,6 +209,25 @@ def test_set_accelerator(resnet18):
     assert model2.accelerator
 
 
+def test_ddp_kwargs():
+    config = Model._add_ddp_kwargs({"fp16": True})
+    handler = config["kwargs_handlers"][0]
+    assert isinstance(handler, DistributedDataParallelKwargs)
+    assert handler.gradient_as_bucket_view
+
+    user_handler = DistributedDataParallelKwargs(find_unused_parameters=True)
+    config = Model._add_ddp_kwargs({"kwargs_handlers": [user_handler]})
+    assert config["kwargs_handlers"] == [user_handler]
+
+
+def test_register_comm_hook(cnn_model):
+    with pytest.raises(AssertionError):
+        cnn_model.register_comm_hook("int8")
+    # learner is not wrapped with DDP in a single process
+    cnn_model.compile(ddp_comm_hook="bf16")
+    assert cnn_model._ddp_comm_hook is None
+
+
 def test_save_model(tmp_path, resnet18, cnn_model):
     path = f"{tmp_path}/dummy_model.pth"
     cnn_model.save(path, save_extra=True)
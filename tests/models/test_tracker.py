@@ -11,7 +11,11 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
+import pickle
+
+import numpy as np
 import pytest
+import torch
 from rich.table import Table
 
 
@@ -33,12 +37,78 @@ def test_track(tracker):
     tracker._append_logs("score", 0.5)
 
 
+def test_logs(tracker):
+    for _ in range(2000):
+        tracker._append_logs("train/loss", 0.5)
+    tracker._append_logs("val/loss", 0.25)
+    logs = tracker.logs
+    assert len(logs) == 2001
+    assert logs[-1] == {"current_epoch": 0, "val/loss": 0.25}
+
+    columns = tracker.log_columns
+    assert len(columns["value"]) == 2001
+    assert columns["key"][-1] == "val/loss"
+    assert columns["current_epoch"][-1] == 0
+
+    tracker.reset()
+    assert tracker.logs == []
+
+
+def test_log_values(tracker):
+    tracker.track_loss(0.1, "train")
+    tracker._append_logs("train/confusion", np.eye(2))
+    tracker.track_loss(0.2, "train")
+
+    logs = tracker.logs
+    assert logs[0] == {"current_epoch": 0, "train/loss": 0.1}
+    assert np.array_equal(logs[1]["train/confusion"], np.eye(2))
+    assert logs[2] == {"current_epoch": 0, "train/loss": 0.2}
+    assert np.array_equal(tracker.log_columns["value"][1], np.eye(2))
+
+
+def test_unpickle_legacy_logs(tracker):
+    for name in list(vars(tracker)):
+        if name.startswith("_log") or name in ("_key_to_id", "_keys"):
+            delattr(tracker, name)
+    legacy_logs = [{"current_epoch": 0, "train/loss": 0.5}, {"current_epoch": 1, "val/loss": 0.25}]
+    tracker.__dict__["logs"] = legacy_logs
+
+    restored = pickle.loads(pickle.dumps(tracker))
+    assert restored.logs == legacy_logs
+    restored.track_loss(0.1, "train")
+    assert restored.logs[-1] == {"current_epoch": 0, "train/loss": 0.1}
+
+
+def test_track_metrics(tracker):
+    tracker.track_metrics({"accuracy": torch.tensor(0.5), "f1": torch.tensor(1), "score": 0.25}, mode="train")
+    assert tracker.train_metrics["accuracy"].avg == 0.5
+    assert tracker.train_metrics["f1"].avg == 1.0
+    assert tracker.logs[-1] == {"current_epoch": 0, "train/score": 0.25}
+
+    tracker.track_metrics({"precision": torch.tensor(0.1, dtype=torch.float64)}, mode="val")
+    assert tracker.logs[-1] == {"current_epoch": 0, "val/precision": 0.1}
+
+
 def test_create_table(tracker):
     tracker.track_loss(0.1, "train")
     tracker.track_loss(0.2, "val")
     tracker.track_metrics({"accuracy": 0.9}, mode="train")
     table = tracker.create_table()
     assert isinstance(table, Table)
+    assert tracker.create_table() is table
+    assert tracker.__rich__() is table
+
+    tracker.track_loss(0.3, "train")
+    assert tracker.create_table() is not table
+
+
+def test_unpickle_table_cache(tracker):
+    tracker.create_table()
+    del tracker._table, tracker._table_data  # Tracker saved before the table was cached
+
+    restored = pickle.loads(pickle.dumps(tracker))
+    assert restored._table is None
+    assert isinstance(restored.create_table(), Table)
 
 
 def test_get_item(tracker):
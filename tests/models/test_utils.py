@@ -23,8 +23,9 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
+from torch import nn
 
-from gradsflow.models.utils import available_losses, available_metrics
+from gradsflow.models.utils import available_losses, available_metrics, ddp_bucket_cap_mb
 
 
 def test_available_losses():
@@ -35,3 +36,8 @@ def test_available_losses():
 def test_available_metrics():
     assert isinstance(available_metrics()[0], str)
     assert isinstance(available_metrics(), list)
+
+
+def test_ddp_bucket_cap_mb():
+    assert ddp_bucket_cap_mb(nn.Linear(4, 2)) == 10
+    assert ddp_bucket_cap_mb([nn.Linear(4, 2), nn.Linear(2, 1)]) == 10